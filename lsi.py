@@ -3,13 +3,12 @@
 """An interactive viewer for todo-txt."""
 
 import os
-import re
 import sys
-import time
-import argparse
-import subprocess
 import curses
+from bisect import bisect_right
+from collections import namedtuple
 from contextlib import contextmanager, suppress
+from itertools import islice
 
 """Maps a priority to a color. First entry is priority A, second B, and so on.
 If there are more priorities than colors, the last entry will be used for the
@@ -40,48 +39,94 @@ COLORS_FALLBACK = [
 COLOR_STATUSBAR_FALLBACK = curses.COLOR_WHITE
 COLOR_STATUSBAR_ACTIVE_FALLBACK = curses.COLOR_YELLOW
 
-RE_PRIORITY = r'\(([A-Z])\)'
-RE_DATE = r'\d{4}-\d{2}-\d{2}'
 KEY_ESC = 27
 KEY_BACKSPACE = 127
+MOUSE_WHEEL_DOWN = 0x80000
+MOUSE_WHEEL_UP = 0x8000000
+
+"""Maps a (priority, delta) pair to the priority bumped by delta, clamped to
+the A-Z range (see get_bumped_priority)."""
+BUMPED_PRIORITIES = {
+    (chr(letter), delta): chr(max(ord('A'), min(ord('Z'), letter - delta)))
+    for letter in range(ord('A'), ord('Z') + 1) for delta in (-1, 1)
+}
+
+
+"""A single todo item. Everything the render and filter paths need is
+computed once when the todo file is read: id is the line number in the
+todo.txt, line the raw text of that line, priority the priority as a number
+(see get_priority_as_number), prefix the pre-formatted line number shown in
+front of the item, words the visible words of the line (see
+get_visible_words) and lower a lowercased copy of the line used for
+filtering."""
+Item = namedtuple('Item', ['id', 'line', 'priority', 'prefix', 'words',
+                           'lower'])
+
+
+def is_date(word):
+    """Returns True if a word is a date in the YYYY-MM-DD format."""
+    return (len(word) == 10 and word[4] == '-' and word[7] == '-'
+            and word[0:4].isdigit() and word[5:7].isdigit()
+            and word[8:10].isdigit())
+
+
+def get_priority(line):
+    """Returns the priority of a todo line as a letter."""
+    # Priorities always appear at the start of the line as a '(A) ' marker,
+    # so a plain string probe beats entering the regex engine here.
+    if len(line) >= 3 and line[0] == '(' and line[2] == ')' \
+            and 'A' <= line[1] <= 'Z':
+        return line[1]
+    return None
 
 
-def get_priority(item):
-    """Returns the priority of an item as a letter."""
-    match = re.search(RE_PRIORITY, item[1])
-    return match.group(1) if match else None
-
-
-def get_priority_as_number(item, maximum=sys.maxsize):
-    """Returns the priority of an item as a number (A is 0, B is 1, ...)."""
-    priority = get_priority(item)
+def get_priority_as_number(line, maximum=sys.maxsize):
+    """Returns the priority of a todo line as a number (A is 0, B is 1, ...)."""
+    priority = get_priority(line)
     if priority is None:
         return maximum
     return min(maximum, ord(priority) - ord('A'))
 
 
-def get_bumped_priority(item, delta):
-    """Offsets and returns an item's priority by delta (positive -> higher)."""
-    priority = get_priority(item)
+def get_bumped_priority(line, delta):
+    """Offsets and returns a todo line's priority by delta (positive -> higher)."""
+    priority = get_priority(line)
     if priority is not None:
-        return chr(max(ord('A'), min(ord('Z'), ord(priority) - delta)))
+        return BUMPED_PRIORITIES[(priority, delta)]
     # TODO: if the item has no priority yet, it should be assigned the lowest
     # *used* priority
     return None
 
 
+def get_visible_words(line):
+    """Returns the words of a todo line that the viewer shows, i.e. with the
+    priority marker and any dates stripped."""
+    # The priority marker is a fixed-size '(X) ' prefix, so a slice is much
+    # cheaper than a regex substitution here.
+    if len(line) >= 4 and line[0] == '(' and line[2] == ')' \
+            and line[3] == ' ' and 'A' <= line[1] <= 'Z':
+        line = line[4:]
+    return tuple(word for word in line.split() if not is_date(word))
+
+
 def hex_to_rgb(col):
     """Extracts the RGB values as integers (from 0 to 1000) from a hex color
     string (#rrggbb).
     """
     mul = 1000 / 255
-    return tuple(round(int(col.lstrip('#')[i:i + 2], 16) * mul) for i in (0, 2, 4))
+    value = int(col.lstrip('#'), 16)
+    return (round((value >> 16 & 0xFF) * mul),
+            round((value >> 8 & 0xFF) * mul),
+            round((value & 0xFF) * mul))
 
 
 def dim(rgb, mul=0.6):
     """Returns a dimmer version of a color. If multiplier > 1, a lighter color
     can be produced as well."""
-    return tuple(map(lambda x: min(1000, round(x * mul)), rgb))
+    red, green, blue = rgb
+    return (min(1000, round(red * mul)),
+            min(1000, round(green * mul)),
+            min(1000, round(blue * mul)))
 
 
 def lighten(rgb, mul=1.5):
@@ -89,6 +134,15 @@ def lighten(rgb, mul=1.5):
     return dim(rgb, mul)
 
 
+"""The colors above, converted to RGB once at import so that re-initializing
+the viewer doesn't repeat the conversions. Each entry carries the base color
+plus its dimmed and lightened variants."""
+COLORS_RGB = [hex_to_rgb(color) for color in COLORS]
+COLOR_VARIANTS_RGB = [(rgb, dim(rgb), lighten(rgb)) for rgb in COLORS_RGB]
+COLOR_STATUSBAR_RGB = hex_to_rgb(COLOR_STATUSBAR)
+COLOR_STATUSBAR_ACTIVE_RGB = hex_to_rgb(COLOR_STATUSBAR_ACTIVE)
+
+
 class Dialog:
     """A popup dialog that lets us interact with todo items."""
 
@@ -96,33 +150,25 @@ class Dialog:
         self.item = item
         self.parent = screen
         self.dialog = None
-        self._alive = True
 
     def run(self):
-        """Shows the dialog and enters a rendering loop."""
+        """Shows the dialog and waits for a keypress to dismiss it."""
         self._init()
-        while self._alive:
-            self._render()
-            self._handle_input()
-
-    def close(self):
-        """Closes the dialog."""
-        self._alive = False
+        self._render()
+        self.dialog.getch()
 
     def _init(self):
         _, num_cols = self.parent.getmaxyx()
         self.dialog = curses.newwin(5, num_cols, 0, 0)
 
-    def _handle_input(self):
-        self.dialog.getch()
-        self.close()
-
     def _render(self):
         self.dialog.erase()
         self.dialog.attron(curses.color_pair(0))
-        self.dialog.addstr(1, 2, '{:} {:}'.format(*self.item))
+        self.dialog.addstr(1, 2, '{:} {:}'.format(self.item.id,
+                                                  self.item.line))
         self.dialog.box()
-        self.dialog.refresh()
+        self.dialog.noutrefresh()
+        curses.doupdate()
 
 
 class TodoListViewer:
@@ -135,17 +181,14 @@ class TodoListViewer:
 
     @property
     def selected_item(self):
-        """Returns the currently selected item, which is a tuple in the form of:
-        (item_id, line), item_id being the line number in the todo.txt and line
-        being the text of that line.
-        """
+        """Returns the currently selected Item, or None if there is none."""
         return self._items[self._selected_line] if self._items else None
 
     @property
     def selected_id(self):
         """Returns the line number of the currently selected item."""
         item = self.selected_item
-        return item[0] if item else None
+        return item.id if item else None
 
     @property
     def todo_path(self):
@@ -179,15 +222,61 @@ class TodoListViewer:
         self._all_items = []
         self._filter = filter or ''
         self._filtering = False
+        self._last_filter = ''
+        self._filter_blob = ''
+        self._line_starts = [0]
         self._simple_colors = simple_colors
         self._num_colors = 0
         self._num_reserved_colors = 0
         self._num_color_variants = 0
+        self._color_variants = []
         self._mouse = mouse
         self._watch = watch
         self._observer = None
+        self._refresh_timer = None
+        self._refresh_pending = False
+        self._dirty = True
+        self._full_redraw = True
+        self._shadow = {}
+        self._drawn_statusbar = None
+        self._todo_mtime = None
+        self._key_handlers = {
+            # j/k: up/down
+            ord('k'): lambda: self._move_selection(-1),
+            curses.KEY_UP: lambda: self._move_selection(-1),
+            ord('j'): lambda: self._move_selection(1),
+            curses.KEY_DOWN: lambda: self._move_selection(1),
+            # HOME/END: scroll to top/bottom
+            curses.KEY_HOME: self._select_first,
+            curses.KEY_END: self._select_last,
+            # q/ESC: cancel filter or quit
+            ord('q'): self._cancel_filter_or_quit,
+            KEY_ESC: self._cancel_filter_or_quit,
+            # r: refresh
+            ord('r'): self.refresh,
+            # e: edit
+            ord('e'): self._edit_todo_file,
+            # /: filter
+            ord('/'): self._start_filtering,
+            # d: done
+            ord('d'): self._complete_selected,
+            # n: nav
+            ord('n'): self._navigate_to_selected,
+            # SPACE/RETURN: Enter item dialog
+            ord(' '): self._open_dialog,
+            ord('\n'): self._open_dialog,
+            # -/=: Bump priority
+            ord('='): lambda: self._bump_selected_priority(1),
+            ord('-'): lambda: self._bump_selected_priority(-1),
+            # 0: Remove priority
+            ord('0'): lambda: self._set_selected_priority(None),
+            curses.KEY_MOUSE: self._handle_mouse,
+            curses.KEY_RESIZE: self._handle_resize,
+        }
 
     def __del__(self):
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
         if self._observer:
             self._observer.stop()
 
@@ -196,8 +285,17 @@ class TodoListViewer:
         try:
             self._init()
             while self._alive:
-                self._move_selection_into_view()
-                self._render()
+                # Refreshes requested by the filesystem watch are performed
+                # here, since curses isn't thread-safe.
+                if self._refresh_pending:
+                    self._refresh_pending = False
+                    self.refresh()
+                # Skip the entire render path unless some handler actually
+                # changed state since the last frame.
+                if self._dirty:
+                    self._dirty = False
+                    self._move_selection_into_view()
+                    self._render()
                 if self._filtering:
                     self._handle_filter_input()
                 else:
@@ -214,12 +312,12 @@ class TodoListViewer:
         with self.retain_selection():
             self._read_todo_file()
             curses.flash()
-        self._render()
+        self._dirty = True
 
     def select_item_id(self, item_id):
         """Selects the item with a specific id."""
         for item_index, item in enumerate(self._items):
-            if item[0] == item_id:
+            if item.id == item_id:
                 self._selected_line = item_index
                 break
 
@@ -239,19 +337,29 @@ class TodoListViewer:
         yield
         self._watch = prev
 
-    def _run_subprocess(self, command, retain_selection=True):
+    def _run_subprocess(self, command, retain_selection=True, mutates=True):
+        # Deferred import: only sessions that actually invoke todo.sh pay
+        # for it.
+        import subprocess
+        if mutates:
+            # The subprocess may rewrite todo.txt, so force the next read.
+            self._todo_mtime = None
+        reinit = self._init if mutates else self._init_screen
         with self.disable_watch():
             curses.endwin()
             if retain_selection:
                 with self.retain_selection():
                     subprocess.run([str(x) for x in command])
-                    self._init()
+                    reinit()
             else:
                 subprocess.run([str(x) for x in command])
-                self._init()
+                reinit()
 
     def _init(self):
         self._read_todo_file()
+        self._init_screen()
+
+    def _init_screen(self):
         self.screen = curses.initscr()
         self.screen.keypad(1)
         curses.curs_set(0)
@@ -260,6 +368,14 @@ class TodoListViewer:
         self._init_colors()
         if self._watch:
             self._init_watch()
+            # The timer thread can't wake a getch that is already blocked in
+            # read(), so poll instead: getch returns -1 every 100ms and the
+            # main loop gets a chance to check _refresh_pending.
+            self.screen.timeout(100)
+        # Re-entering curses leaves the terminal blank, so the next render
+        # must repaint everything even if the items didn't change.
+        self._full_redraw = True
+        self._dirty = True
 
     def _init_colors(self):
         curses.start_color()
@@ -268,16 +384,16 @@ class TodoListViewer:
             self._simple_colors = True
         if not self._simple_colors:
             # Set reserved colors
-            self._define_color(1, hex_to_rgb(COLOR_STATUSBAR))
-            self._define_color(2, hex_to_rgb(COLOR_STATUSBAR_ACTIVE))
+            self._define_color(1, COLOR_STATUSBAR_RGB)
+            self._define_color(2, COLOR_STATUSBAR_ACTIVE_RGB)
             self._num_reserved_colors = 3
             # Set item colors
             self._num_color_variants = 3
-            for color_index, color in enumerate(COLORS):
+            define_color = self._define_color
+            for color_index, variants in enumerate(COLOR_VARIANTS_RGB):
                 color_index = color_index * self._num_color_variants + self._num_reserved_colors
-                self._define_color(color_index, hex_to_rgb(color))
-                self._define_color(color_index + 1, dim(hex_to_rgb(color)))
-                self._define_color(color_index + 2, lighten(hex_to_rgb(color)))
+                for offset, rgb in enumerate(variants):
+                    define_color(color_index + offset, rgb)
             self._num_colors = len(COLORS)
         else:
             # Set reserved colors
@@ -290,218 +406,388 @@ class TodoListViewer:
                 color_index += self._num_reserved_colors
                 curses.init_pair(color_index, color, -1)
             self._num_colors = len(COLORS_FALLBACK)
+        # Color pairs never change after this point, so precompute the
+        # variant triple for every priority bucket once; the render path then
+        # only does a list lookup per row.
+        self._color_variants = [
+            self._make_color_variants(priority)
+            for priority in range(self._num_colors)
+        ]
 
     def _init_watch(self):
         if self._observer:
             return
-        from watchdog.observers import Observer
-        from watchdog.events import FileSystemEventHandler
+        try:
+            # Prefer the native inotify backend where available; the generic
+            # Observer may pick a polling fallback on some platforms.
+            from watchdog.observers.inotify import InotifyObserver as Observer
+        except Exception:
+            # On macOS/BSD the import fails with watchdog's own
+            # UnsupportedLibcError rather than an ImportError, so catch
+            # broadly and use the platform default (fsevents/kqueue).
+            from watchdog.observers import Observer
+        from watchdog.events import PatternMatchingEventHandler
         viewer = self
 
-        class _Watch(FileSystemEventHandler):
+        class _Watch(PatternMatchingEventHandler):
             def on_modified(self, event):
-                if viewer.is_watching and event.src_path.endswith('todo.txt'):
-                    # It appears todotxt adds the priority in a second I/O,
-                    # so if we're responding too quickly there's a chance we
-                    # will miss it entirely.
-                    time.sleep(.1)
-                    viewer.refresh()
+                if viewer.is_watching:
+                    viewer._schedule_refresh()
 
         self._observer = Observer()
-        self._observer.schedule(_Watch(), self._root)
+        # Let watchdog filter out events for other files in the directory
+        # (editor swap files, done.txt, ...) before they reach the handler.
+        self._observer.schedule(
+            _Watch(patterns=['*/todo.txt'], ignore_directories=True),
+            self._root)
         self._observer.start()
 
+    def _schedule_refresh(self):
+        """Schedules a refresh of the view. Editors tend to emit several
+        filesystem events per save (and todotxt adds the priority in a second
+        I/O), so bursts are coalesced into a single refresh that fires once
+        the file has been quiet for a moment."""
+        import threading
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self._refresh_timer = threading.Timer(.1, self._request_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _request_refresh(self):
+        # Runs on a timer thread: curses isn't thread-safe, so just flag the
+        # main loop; its polling getch picks the flag up within 100ms.
+        self._refresh_pending = True
+
     def _define_color(self, color_index, rgb):
         assert color_index > 0  # Don't overwrite background color
         curses.init_color(color_index, *rgb)
         curses.init_pair(color_index, color_index, -1)
 
-    def _get_item_color_index(self, item):
-        priority = get_priority_as_number(item, maximum=self._num_colors - 1)
-        return priority * self._num_color_variants + self._num_reserved_colors
-
-    def _get_item_color_variants(self, item):
-        color_index = self._get_item_color_index(item)
+    def _make_color_variants(self, priority):
+        color_index = priority * self._num_color_variants + self._num_reserved_colors
         pair = curses.color_pair
         if self._simple_colors:
             return (
                 pair(color_index),
                 pair(color_index) | curses.A_DIM,
                 pair(color_index) | curses.A_BOLD)
-        else:
-            return (
-                pair(color_index),
-                pair(color_index if self._simple_colors else color_index + 1),
-                pair(color_index if self._simple_colors else color_index + 2)
-            )
+        return (
+            pair(color_index),
+            pair(color_index + 1),
+            pair(color_index + 2))
+
+    def _get_item_color_variants(self, item):
+        return self._color_variants[min(item.priority, self._num_colors - 1)]
 
     def _read_todo_file(self):
+        # Re-reading and re-sorting is pointless if the file didn't change.
+        mtime = os.stat(self.todo_path).st_mtime_ns
+        if mtime == self._todo_mtime:
+            return
+        self._todo_mtime = mtime
         self._items.clear()
+        # Partition into per-priority buckets instead of comparison-sorting:
+        # there are only 27 possible keys (A-Z plus "no priority"), so a
+        # single pass over the file suffices and stays stable within each
+        # priority.
+        num_buckets = ord('Z') - ord('A') + 2
+        buckets = [[] for _ in range(num_buckets)]
+        # Read the file in one call and split it in C; iterating the file
+        # object line by line costs a Python-level readahead per line.
         with open(self.todo_path, 'r') as todofile:
-            lines = todofile.readlines()
-        items = [(index + 1, line) for index, line in enumerate(lines)]
-        self._all_items = sorted(items, key=get_priority_as_number)
+            lines = todofile.read().splitlines()
+        for index, line in enumerate(lines, 1):
+            priority = get_priority_as_number(line, maximum=num_buckets - 1)
+            buckets[priority].append(Item(
+                id=index,
+                line=line,
+                priority=priority,
+                prefix='{:02d} '.format(index),
+                words=get_visible_words(line),
+                lower=line.lower()))
+        self._all_items = [item for bucket in buckets for item in bucket]
+        # Join the lowercased lines into a single buffer so a filter needle
+        # can be matched with one C-level scan (see _apply_filter). The
+        # recorded start offsets map a hit back to its item.
+        starts = [0]
+        offset = 0
+        for item in self._all_items:
+            offset += len(item.lower) + 1
+            starts.append(offset)
+        self._filter_blob = '\n'.join(item.lower for item in self._all_items)
+        self._line_starts = starts
         self._items = self._all_items
         self._apply_filter()
 
     def _apply_filter(self):
         if not self._filter:
             self._items = self._all_items
+        elif self._last_filter and self._filter.startswith(self._last_filter):
+            # When the filter merely grew (the user typed forward), every
+            # match is already in the previous result, so narrowing that down
+            # beats rescanning all items.
+            needle = self._filter.lower()
+            self._items = [item for item in self._items
+                           if needle in item.lower]
         else:
-            self._items = []
-            for item in self._all_items:
-                if self._filter.lower() in item[1].lower():
-                    self._items.append(item)
+            # Scan the concatenated lowercase buffer instead of testing each
+            # line separately; each line ends in a newline and the needle
+            # cannot contain one, so matches never span two lines.
+            needle = self._filter.lower()
+            blob = self._filter_blob
+            starts = self._line_starts
+            self._items = items = []
+            pos = blob.find(needle)
+            while pos >= 0:
+                index = bisect_right(starts, pos) - 1
+                items.append(self._all_items[index])
+                pos = blob.find(needle, starts[index + 1])
+        self._last_filter = self._filter
         self._selected_line = 0
+        self._dirty = True
 
     def _handle_filter_input(self):
         key = self.screen.getch()
         if key in (ord('\n'), curses.KEY_UP, curses.KEY_DOWN, KEY_ESC):
             self._filtering = False
+            self._dirty = True  # The status bar drops its highlight
         elif key == KEY_BACKSPACE:
-            self._filter = self._filter[:len(
-                self._filter) - 1] if self._filter else ''
-        else:
+            if self._filter:
+                self._filter = self._filter[:-1]
+                self._apply_filter()
+        elif 32 <= key < 127:
+            # Ignore control characters, function keys and the -1 returned
+            # by a timed-out getch: they don't belong in the filter string,
+            # and re-filtering on them would be wasted work.
             self._filter += chr(key)
-        self._apply_filter()
+            self._apply_filter()
 
     def _handle_input(self):
-        key = self.screen.getch()
-        # j/k: up/down
-        if key in (ord('k'), curses.KEY_UP):
-            self._selected_line -= 1
-        elif key in (ord('j'), curses.KEY_DOWN):
-            self._selected_line += 1
-        # HOME/END: scroll to top/bottom
-        elif key == curses.KEY_HOME:
-            self._selected_line = 0
-        elif key == curses.KEY_END:
-            self._selected_line = len(self._items) - 1
-        # q/ESC: cancel filter or quit
-        elif key in (ord('q'), KEY_ESC):
-            if self._filter:
-                with self.retain_selection():
-                    self._filter = ''
-                    self._apply_filter()
-            else:
-                self.close()
-        # r: refresh
-        elif key == ord('r'):
-            self.refresh()
-        # e: edit
-        elif key == ord('e'):
-            self._run_subprocess(['todo.sh', 'edit'])
-        # /: filter
-        elif key == ord('/'):
+        self._dispatch_key(self.screen.getch())
+        # Under fast key-repeat more keys are usually queued up already;
+        # apply their combined effect now so a whole batch is followed by a
+        # single render instead of one render per key.
+        self.screen.nodelay(True)
+        try:
+            while self._alive and not self._filtering:
+                key = self.screen.getch()
+                if key == -1:
+                    break
+                self._dispatch_key(key)
+        finally:
+            # Restore the watch polling timeout, or blocking reads when no
+            # watch is active (nodelay(False) would clobber the timeout).
+            self.screen.timeout(100 if self._watch else -1)
+
+    def _dispatch_key(self, key):
+        handler = self._key_handlers.get(key)
+        if handler is not None:
+            handler()
+        # A-Z: Set priority
+        elif key >= ord('A') and key <= ord('Z'):
+            self._set_selected_priority(chr(key))
+
+    def _move_selection(self, delta):
+        self._selected_line += delta
+        self._dirty = True
+
+    def _select_first(self):
+        self._selected_line = 0
+        self._dirty = True
+
+    def _select_last(self):
+        self._selected_line = len(self._items) - 1
+        self._dirty = True
+
+    def _cancel_filter_or_quit(self):
+        if self._filter:
+            with self.retain_selection():
+                self._filter = ''
+                self._apply_filter()
+        else:
+            self.close()
+
+    def _edit_todo_file(self):
+        self._run_subprocess(['todo.sh', 'edit'])
+
+    def _start_filtering(self):
+        if self._filter:
+            # '/' discards the previous filter, so restore the full list
+            # right away; otherwise leaving filter mode without typing
+            # would keep showing the stale filtered result.
             self._filter = ''
-            self._filtering = True
-        # d: done
-        elif self.has_selection and key == ord('d'):
+            self._apply_filter()
+        self._filtering = True
+        self._dirty = True
+
+    def _complete_selected(self):
+        if self.has_selection:
             self._run_subprocess(
                 ['todo.sh', 'do', self.selected_id], retain_selection=False)
-        # n: nav
-        elif self.has_selection and key == ord('n'):
-            self._run_subprocess(['todo.sh', 'nav', self.selected_id])
-        # SPACE/RETURN: Enter item dialog
-        elif self.has_selection and key in (ord(' '), ord('\n')):
+
+    def _navigate_to_selected(self):
+        if self.has_selection:
+            self._run_subprocess(
+                ['todo.sh', 'nav', self.selected_id], mutates=False)
+
+    def _open_dialog(self):
+        if self.has_selection:
             Dialog(self.screen, self.selected_item).run()
-        # -/=: Bump priority
-        elif self.has_selection and key in (ord('='), ord('-')):
-            delta = 1 if key == ord('=') else -1
-            new_priority = get_bumped_priority(self.selected_item, delta)
+            self._full_redraw = True
+            self._dirty = True
+
+    def _bump_selected_priority(self, delta):
+        if self.has_selection:
+            new_priority = get_bumped_priority(self.selected_item.line, delta)
             self._set_item_priority(self.selected_item, new_priority)
-        # A-Z: Set priority
-        elif self.has_selection and key >= ord('A') and key <= ord('Z'):
-            self._set_item_priority(self.selected_item, chr(key))
-        # 0: Remove priority
-        elif self.has_selection and key == ord('0'):
-            self._set_item_priority(self.selected_item, None)
-        # Mouse events
-        elif key == curses.KEY_MOUSE:
-            # Note: mouse support in curses seems to be pretty poor. I left this
-            # code in case someone wants to experiment with it.
-            _, _, row, _, state = curses.getmouse()
-            if state & 0x80000:  # Wheel down
-                self._selected_line -= 1
-            elif state & 0x8000000:  # Wheel up
-                self._selected_line += 1
-            else:
-                self._selected_line = row
-        # Resize events
-        elif key == curses.KEY_RESIZE:
-            curses.resizeterm(*self.screen.getmaxyx())
+
+    def _set_selected_priority(self, priority):
+        if self.has_selection:
+            self._set_item_priority(self.selected_item, priority)
+
+    def _handle_mouse(self):
+        # Note: mouse support in curses seems to be pretty poor. I left this
+        # code in case someone wants to experiment with it.
+        _, _, row, _, state = curses.getmouse()
+        if state & MOUSE_WHEEL_DOWN:
+            self._selected_line -= 1
+        elif state & MOUSE_WHEEL_UP:
+            self._selected_line += 1
+        else:
+            self._selected_line = row
+        self._dirty = True
+
+    def _handle_resize(self):
+        curses.resizeterm(*self.screen.getmaxyx())
+        self._full_redraw = True
+        self._dirty = True
 
     def _set_item_priority(self, item, priority):
         if priority is None:
-            self._run_subprocess(['todo.sh', 'depri', item[0]])
+            self._run_subprocess(['todo.sh', 'depri', item.id])
         else:
-            self._run_subprocess(['todo.sh', 'pri', item[0], priority])
+            self._run_subprocess(['todo.sh', 'pri', item.id, priority])
 
     def _move_selection_into_view(self):
         num_rows = self.num_rows - 1  # Leave one row for the status bar
-        self._selected_line = max(
-            0, min(len(self._items) - 1, self._selected_line))
+        # Clamp with explicit branches; max(0, min(...)) allocates and
+        # dispatches through the generic comparison protocol on every key.
+        selected_line = self._selected_line
+        last_line = len(self._items) - 1
+        if selected_line < 0 or last_line < 0:
+            self._selected_line = 0
+        elif selected_line > last_line:
+            self._selected_line = last_line
         if self._selected_line < self._scroll_offset:
             self._scroll_offset = self._selected_line
         elif self._selected_line > num_rows + self._scroll_offset:
             self._scroll_offset = self._selected_line - num_rows
 
-    def _print(self, row, col, text, attr):
+    def _print(self, row, col, text, attr, num_cols):
         num_chars = len(text)
-        if col + num_chars > self.num_columns:
-            num_chars = self.num_columns - col
+        if col + num_chars > num_cols:
+            num_chars = num_cols - col
         if num_chars > 0:
             with suppress(curses.error):
                 self.screen.addnstr(row, col, text, num_chars, attr)
         return num_chars
 
-    def _print_chunks(self, row, col, chunks):
-        for text, attr in chunks:
-            col += self._print(row, col, text, attr)
-
-    def _get_color_for_word(self, item, word):
+    def _print_chunks(self, row, col, chunks, num_cols):
+        # Merge adjacent chunks that share the same attributes, so each run
+        # of identically-styled text costs a single curses call.
+        pending = []
+        attr = None
+        for chunk_text, chunk_attr in chunks:
+            if chunk_attr != attr and pending:
+                col += self._print(row, col, ''.join(pending), attr, num_cols)
+                pending.clear()
+            pending.append(chunk_text)
+            attr = chunk_attr
+        if pending:
+            col += self._print(row, col, ''.join(pending), attr, num_cols)
+        return col
+
+    def _print_item(self, index, item, selected, num_cols):
         color, color_dim, color_light = self._get_item_color_variants(item)
-        if word.startswith('@') or word.startswith('+'):
-            return color_light
-        if word.startswith('http://') or word.startswith('https://'):
-            return color_dim
-        return color
-
-    def _print_item(self, index, item, selected=False):
-        _, color_dim, _ = self._get_item_color_variants(item)
         standout = curses.A_STANDOUT if selected else 0
-        linenum, line = item
-        line = re.sub(RE_PRIORITY + ' ', '', line)  # Hide priorities
-        line = re.sub(RE_DATE + ' ', '', line)  # Hide dates
-        self._print_chunks(index, 0, [
-            ('{:02d} '.format(linenum), color_dim | standout),
-            *map(lambda word: (word + ' ',
-                               self._get_color_for_word(item, word) | standout), line.split())
-        ])
-
-    def _render_statusbar(self):
+        chunks = [(item.prefix, color_dim | standout)]
+        for word in item.words:
+            first = word[0]
+            if first == '@' or first == '+':
+                attr = color_light
+            elif first == 'h' and word.startswith(('http://', 'https://')):
+                attr = color_dim
+            else:
+                attr = color
+            chunks.append((word + ' ', attr | standout))
+        col = self._print_chunks(index, 0, chunks, num_cols)
+        # Clear from where the text ended, not from wherever addnstr left
+        # the cursor: after a full-width line it has wrapped to the next
+        # row, and clrtoeol() there would blank that row instead.
+        if col < num_cols:
+            with suppress(curses.error):
+                self.screen.move(index, col)
+                self.screen.clrtoeol()
+
+    def _render_statusbar(self, num_rows, num_cols):
         top = self._scroll_offset + 1
-        bottom = min(len(self._items), self._scroll_offset + self.num_rows)
+        bottom = min(len(self._items), self._scroll_offset + num_rows)
         total = len(self._all_items)
+        # Formatting and rewriting the bar is wasted work if none of its
+        # inputs changed since the last frame.
+        state = (top, bottom, total, self._filter, self._filtering, num_cols)
+        if state == self._drawn_statusbar:
+            return
+        self._drawn_statusbar = state
         text = 'FILTERING: {:}'.format(
             self._filter) if self._filter or self._filtering else ''
         attr = curses.color_pair(
             2 if self._filtering else 1) | curses.A_STANDOUT
         text = 'Showing {:}-{:}/{:} {:}'.format(top, bottom, total, text)
-        self._print(self.num_rows, 0, text.ljust(self.num_columns), attr)
+        self._print(num_rows, 0, text.ljust(num_cols), attr, num_cols)
 
     def _render(self):
-        self.screen.erase()
+        if self._full_redraw:
+            # The terminal contents are unknown (startup, resize, a dialog or
+            # subprocess wrote over them), so consider every row stale.
+            self._shadow.clear()
+            self._drawn_statusbar = None
+            self._full_redraw = False
+        # Snapshot the terminal dimensions once per frame instead of
+        # re-reading them in every helper below.
+        num_rows = self.num_rows
+        num_cols = self.num_columns
+        # Diff each visible row against what was drawn there last frame and
+        # repaint only the rows that differ. For plain selection movement
+        # that's two rows, for a scroll it's the newly exposed ones.
         top = self._scroll_offset
-        bottom = self._scroll_offset + self.num_rows
-        for index, item in enumerate(self._items[top:bottom]):
-            self._print_item(index, item, self.selected_id == item[0])
-        self._render_statusbar()
-        self.screen.refresh()
+        bottom = top + num_rows
+        num_drawn = 0
+        selected_id = self.selected_id
+        for row, item in enumerate(islice(self._items, top, bottom)):
+            selected = selected_id == item.id
+            drawn = (item.id, item.line, selected)
+            if self._shadow.get(row) != drawn:
+                self._print_item(row, item, selected, num_cols)
+                self._shadow[row] = drawn
+            num_drawn += 1
+        # Blank only the rows that had content before but no longer do.
+        for row in range(num_drawn, num_rows):
+            if self._shadow.pop(row, None) is not None:
+                with suppress(curses.error):
+                    self.screen.move(row, 0)
+                    self.screen.clrtoeol()
+        self._render_statusbar(num_rows, num_cols)
+        # Stage the frame and let curses compute the minimal terminal update
+        # in one doupdate pass.
+        self.screen.noutrefresh()
+        curses.doupdate()
 
 
 def main():
     """Main entry point. Parses command line arguments and runs the viewer."""
+    import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('dir')
     parser.add_argument('filter', nargs='?', default=None)